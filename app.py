@@ -1,5 +1,6 @@
 import streamlit as st
 from PIL import Image
+from utils.cache import cache_stats
 
 st.set_page_config(
     page_title="智能助手多应用平台",
@@ -28,4 +29,23 @@ st.markdown(
     """
 )
 
-st.info("如需帮助，请联系平台管理员@旦求誊。") 
\ No newline at end of file
+st.info("如需帮助，请联系平台管理员@旦求誊。") 
+
+with st.expander("📊 缓存统计"):
+    stats = cache_stats()
+    if not stats["namespaces"]:
+        st.write("当前进程尚未使用缓存，访问各功能页面后再查看。")
+    else:
+        st.caption(f"后端：{stats['backend']}（命中统计仅含当前进程，容量为后端整体数据）")
+        st.table([
+            {
+                "命名空间": name,
+                "命中": item["hits"],
+                "未命中": item["misses"],
+                "命中率": f"{item['hit_rate']:.1%}",
+                "错误": item["errors"],
+                "当前占用(字节)": item["size_bytes"] if item["size_bytes"] is not None else "-"
+            }
+            for name, item in stats["namespaces"].items()
+        ])
+        st.json(stats["usage"])
\ No newline at end of file
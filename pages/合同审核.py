@@ -3,12 +3,22 @@ import requests
 import json
 from io import BytesIO
 from utils.config_loader import load_config
+from utils.cache import get_cache, make_key
 from qcloud_cos import CosConfig, CosS3Client
 from datetime import datetime
 
+EXTRACT_ERRORS = {"无法解码文本内容", "PDF解析失败", "DOCX解析失败", "不支持的文件格式"}
+
 def extract_text(file_content, filename):
-    """支持PDF/DOCX/TXT的文本提取"""
+    """支持PDF/DOCX/TXT的文本提取，结果按文件内容缓存"""
     ext = filename.split('.')[-1].lower()
+    return get_cache("extract_text").get_or_set(
+        make_key("contract", ext, file_content),
+        lambda: _extract_text(file_content, ext),
+        should_cache=lambda text: text not in EXTRACT_ERRORS
+    )
+
+def _extract_text(file_content, ext):
     if ext == 'txt':
         for encoding in ['utf-8', 'gbk', 'gb2312']:
             try:
@@ -46,6 +56,14 @@ def upload_to_cos(file_content, filename):
         if not all([secret_id, secret_key, bucket_name]):
             st.error("腾讯云COS配置不完整")
             return None
+        
+        # 相同文件已上传过则直接复用其url，避免各副本重复上传
+        upload_cache = get_cache("cos_upload")
+        cache_key = make_key(bucket_name, region, "contract_audit", filename, file_content)
+        cos_url = upload_cache.get(cache_key)
+        if cos_url:
+            st.success(f"文件已上传到腾讯云COS")
+            return cos_url
             
         cos_config_obj = CosConfig(Region=region, SecretId=secret_id, SecretKey=secret_key)
         client = CosS3Client(cos_config_obj)
@@ -54,6 +72,7 @@ def upload_to_cos(file_content, filename):
         
         client.put_object(Bucket=bucket_name, Body=file_content, Key=file_key)
         cos_url = f"https://{bucket_name}.cos.{region}.myqcloud.com/{file_key}"
+        upload_cache.set(cache_key, cos_url)
         st.success(f"文件已上传到腾讯云COS")
         return cos_url
     except Exception as e:
@@ -200,6 +219,8 @@ if 'audit_result' not in st.session_state:
     st.session_state.audit_result = ""
 if 'uploaded_filename' not in st.session_state:
     st.session_state.uploaded_filename = ""
+if 'audit_from_cache' not in st.session_state:
+    st.session_state.audit_from_cache = False
 
 st.set_page_config(page_title="合同审核", page_icon="📄")
 st.title("📄 合同审核智能体")
@@ -212,6 +233,8 @@ workflow_id = config["coze"].get("contract_workflow_id")
 # 如果审核已完成，显示结果页面
 if st.session_state.audit_completed and st.session_state.audit_result:
     st.success("✅ 审核已完成！")
+    if st.session_state.audit_from_cache:
+        st.info("已命中缓存，直接返回此前对相同合同的审核结果；如需重新审核，请勾选“忽略缓存，重新审核”后再提交")
     
     with st.expander("📄 审核结果详情", expanded=True):
         display_audit_result(st.session_state.audit_result)
@@ -230,6 +253,7 @@ if st.session_state.audit_completed and st.session_state.audit_result:
             st.session_state.audit_completed = False
             st.session_state.audit_result = ""
             st.session_state.uploaded_filename = ""
+            st.session_state.audit_from_cache = False
             st.rerun()
     
     with col2:
@@ -248,6 +272,8 @@ if uploaded_file:
         content_text = extract_text(file_content, uploaded_file.name)
         st.text(content_text[:1000] if content_text else "无法预览内容")
     
+    force_refresh = st.checkbox("忽略缓存，重新审核", help="相同合同默认直接返回此前的审核结果，勾选后重新调用智能体")
+    
     if st.button("🚀 开始审核", type="primary"):
         with st.spinner("正在上传文件到腾讯云COS..."):
             cos_url = upload_to_cos(file_content, uploaded_file.name)
@@ -266,6 +292,17 @@ if uploaded_file:
                 st.json(data)
                 st.write("cos_url:", cos_url)
             
+            workflow_cache = get_cache("coze_workflow")
+            # 按文件内容而非cos_url（含上传时间戳）生成键，重新上传或改名后仍可命中
+            cache_key = make_key(workflow_id, "contract", file_content)
+            cached_result = None if force_refresh else workflow_cache.get(cache_key)
+            if cached_result:
+                st.session_state.audit_completed = True
+                st.session_state.audit_result = cached_result
+                st.session_state.uploaded_filename = uploaded_file.name
+                st.session_state.audit_from_cache = True
+                st.rerun()
+            
             try:
                 response = requests.post(
                     "https://api.coze.cn/v1/workflow/stream_run",
@@ -282,9 +319,11 @@ if uploaded_file:
                     audit_result = process_stream_response(response)
                     
                     if audit_result:
+                        workflow_cache.set(cache_key, audit_result)
                         st.session_state.audit_completed = True
                         st.session_state.audit_result = audit_result
                         st.session_state.uploaded_filename = uploaded_file.name
+                        st.session_state.audit_from_cache = False
                         st.balloons()
                         st.rerun()
                     else:
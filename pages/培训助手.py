@@ -2,6 +2,7 @@ import streamlit as st
 import requests
 import json
 from utils.config_loader import load_config
+from utils.cache import get_cache, make_key
 import os
 from io import BytesIO
 import base64
@@ -10,8 +11,17 @@ from qcloud_cos import CosConfig, CosS3Client
 # 文档内容提取工具
 from typing import Optional
 
+PREVIEW_ERROR = "（无法预览该格式内容）"
+
 def extract_text(file: bytes, filename: str) -> str:
     ext = os.path.splitext(filename)[-1].lower()
+    return get_cache("extract_text").get_or_set(
+        make_key("train", ext, file),
+        lambda: _extract_text(file, ext),
+        should_cache=lambda text: text != PREVIEW_ERROR
+    )
+
+def _extract_text(file: bytes, ext: str) -> str:
     if ext == ".txt":
         try:
             return file.decode("utf-8", errors="ignore")
@@ -50,6 +60,13 @@ def upload_to_cos(file_content, filename):
         if not all([secret_id, secret_key, bucket_name]):
             st.error("腾讯云COS配置不完整，请在config.json中配置secret_id、secret_key和bucket_name")
             return None
+        # 相同文件已上传过则直接复用其url，避免各副本重复上传
+        upload_cache = get_cache("cos_upload")
+        cache_key = make_key(bucket_name, region, "train_helper", filename, file_content)
+        cos_url = upload_cache.get(cache_key)
+        if cos_url:
+            st.success(f"文件已成功上传到腾讯云COS: {cos_url}")
+            return cos_url
         cos_config_obj = CosConfig(
             Region=region,
             SecretId=secret_id,
@@ -67,6 +84,7 @@ def upload_to_cos(file_content, filename):
             EnableMD5=False
         )
         cos_url = f"https://{bucket_name}.cos.{region}.myqcloud.com/{file_key}"
+        upload_cache.set(cache_key, cos_url)
         st.success(f"文件已成功上传到腾讯云COS: {cos_url}")
         return cos_url
     except Exception as e:
@@ -107,6 +125,7 @@ with st.form("题型设置"):
         true_false_cnt = st.number_input("判断题数量", min_value=0, max_value=100, value=1, step=1)
     with col4:
         short_answer_cnt = st.number_input("简答题数量", min_value=0, max_value=100, value=1, step=1)
+    force_refresh = st.checkbox("忽略缓存，重新生成", help="相同文档和题型设置默认直接返回此前的生成结果，勾选后重新调用智能体")
     submit_btn = st.form_submit_button("生成培训内容")
 
 if uploaded_file:
@@ -141,24 +160,37 @@ if uploaded_file:
             }
             with st.expander("调试信息"):
                 st.json(data)
+            workflow_cache = get_cache("coze_workflow")
+            # 按文件内容而非cos_url（含上传时间戳）生成键，重新上传或改名后仍可命中
+            parameters = {k: v for k, v in data["parameters"].items() if k != "knowledge_file"}
+            cache_key = make_key(workflow_id, file_content, parameters)
             try:
-                response = requests.post(base_url, headers=headers, data=json.dumps(data, ensure_ascii=False), timeout=600, stream=True)
-                st.write("响应状态码:", response.status_code)
-                if response.status_code == 200:
-                    train_result = ""
-                    with st.expander("流式生成进度"):
-                        for line in response.iter_lines(decode_unicode=False):
-                            if line and line.startswith(b"data: "):
-                                data_str = line[6:].decode('utf-8', errors='replace')
-                                try:
-                                    data_json = json.loads(data_str)
-                                    content = data_json.get("content", "")
-                                    if content:
-                                        train_result += content
-                                        st.write(content)
-                                except Exception:
-                                    train_result += data_str
-                                    st.write(data_str)
+                train_result = None if force_refresh else workflow_cache.get(cache_key)
+                if train_result:
+                    st.info("已命中缓存，直接返回此前对相同文档和题型设置的生成结果；如需重新生成，请勾选“忽略缓存，重新生成”后再提交")
+                    response_ok = True
+                else:
+                    response = requests.post(base_url, headers=headers, data=json.dumps(data, ensure_ascii=False), timeout=600, stream=True)
+                    st.write("响应状态码:", response.status_code)
+                    response_ok = response.status_code == 200
+                    if response_ok:
+                        train_result = ""
+                        with st.expander("流式生成进度"):
+                            for line in response.iter_lines(decode_unicode=False):
+                                if line and line.startswith(b"data: "):
+                                    data_str = line[6:].decode('utf-8', errors='replace')
+                                    try:
+                                        data_json = json.loads(data_str)
+                                        content = data_json.get("content", "")
+                                        if content:
+                                            train_result += content
+                                            st.write(content)
+                                    except Exception:
+                                        train_result += data_str
+                                        st.write(data_str)
+                        if train_result:
+                            workflow_cache.set(cache_key, train_result)
+                if response_ok:
                     if train_result:
                         st.success("生成完成！")
                         with st.expander("查看生成过程与结果"):
@@ -2,6 +2,7 @@ import streamlit as st
 import requests
 import json
 from utils.config_loader import load_config
+from utils.cache import get_cache, make_key
 
 st.set_page_config(page_title="知识库助手", page_icon="💬")
 
@@ -37,11 +38,22 @@ def send_message(user_input):
             "messages": st.session_state.chat_history,
             "stream": False
         }
+        # 相同对话上下文的回复可在各副本间复用，常见问题无需重复调用接口
+        chat_cache = get_cache("fastgpt_chat")
+        cache_key = make_key(gpt_api, gpt_appid, st.session_state.chat_history)
+        reply = chat_cache.get(cache_key)
+        if reply:
+            st.session_state.chat_history.append({"role": "assistant", "content": reply})
+            return
         try:
             resp = requests.post(gpt_api, headers=headers, data=json.dumps(payload), timeout=60)
             if resp.status_code == 200:
                 data = resp.json()
-                reply = data.get("choices", [{}])[0].get("message", {}).get("content", "无回复")
+                reply = data.get("choices", [{}])[0].get("message", {}).get("content")
+                if reply:
+                    chat_cache.set(cache_key, reply)
+                else:
+                    reply = "无回复"
                 st.session_state.chat_history.append({"role": "assistant", "content": reply})
             else:
                 st.session_state.chat_history.append({"role": "assistant", "content": f"[接口错误] 状态码：{resp.status_code}"})
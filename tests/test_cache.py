@@ -0,0 +1,296 @@
+import os
+import threading
+import time
+
+import pytest
+
+from utils import cache
+
+
+class FakeClock:
+    """可手动推进的时钟，替换 cache 模块中的 time"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class BrokenBackend:
+    def get(self, key):
+        raise ConnectionError("backend down")
+
+    def set(self, key, data, ttl=None):
+        raise ConnectionError("backend down")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache, "time", fake)
+    return fake
+
+
+@pytest.fixture(autouse=True)
+def reset_registry(monkeypatch):
+    monkeypatch.setattr(cache, "_backend", None)
+    monkeypatch.setattr(cache, "_cache_config", None)
+    monkeypatch.setattr(cache, "_caches", {})
+
+
+@pytest.fixture(params=["memory", "disk"])
+def local_backend(request, tmp_path):
+    if request.param == "memory":
+        return cache.MemoryBackend(max_bytes=100)
+    return cache.DiskBackend(str(tmp_path), max_bytes=100 + 3 * cache.DiskBackend._HEADER.size)
+
+
+VALUE = {"text": "合同条款" * 500, "numbers": [1, 2.5, None, True]}
+
+
+def test_roundtrip_msgpack_zstd():
+    pytest.importorskip("msgpack")
+    pytest.importorskip("zstandard")
+    data = cache.dumps(VALUE, compress_threshold=16)
+    assert data[0] == cache._CODEC_MSGPACK | cache._COMPRESS_ZSTD
+    assert cache.loads(data) == VALUE
+
+
+def test_roundtrip_json_zlib(monkeypatch):
+    monkeypatch.setattr(cache, "msgpack", None)
+    monkeypatch.setattr(cache, "zstandard", None)
+    data = cache.dumps(VALUE, compress_threshold=16)
+    assert data[0] == cache._CODEC_JSON | cache._COMPRESS_ZLIB
+    assert cache.loads(data) == VALUE
+
+
+def test_small_values_are_not_compressed():
+    data = cache.dumps("短文本", compress_threshold=1024)
+    assert data[0] & 0x0F == cache._COMPRESS_NONE
+    assert cache.loads(data) == "短文本"
+
+
+def test_loads_rejects_unavailable_codec(monkeypatch):
+    pytest.importorskip("msgpack")
+    data = cache.dumps(VALUE)
+    monkeypatch.setattr(cache, "msgpack", None)
+    with pytest.raises(ValueError):
+        cache.loads(data)
+
+
+def test_make_key_separates_parts():
+    assert cache.make_key("ab", "c") != cache.make_key("a", "bc")
+    assert cache.make_key(b"file", {"a": 1, "b": 2}) == cache.make_key(b"file", {"b": 2, "a": 1})
+
+
+def test_ttl_expiry(local_backend, clock):
+    local_backend.set("dqt:ns:k", b"v", ttl=10)
+    clock.now += 9
+    assert local_backend.get("dqt:ns:k") == b"v"
+    clock.now += 2
+    assert local_backend.get("dqt:ns:k") is None
+    assert local_backend.size_bytes == 0
+
+
+def test_entries_without_ttl_do_not_expire(local_backend, clock):
+    local_backend.set("dqt:ns:k", b"v")
+    clock.now += 10 ** 9
+    assert local_backend.get("dqt:ns:k") == b"v"
+
+
+def test_memory_lru_evicts_least_recently_used():
+    backend = cache.MemoryBackend(max_bytes=30)
+    backend.set("a", b"x" * 10)
+    backend.set("b", b"x" * 10)
+    backend.set("c", b"x" * 10)
+    backend.get("a")
+    backend.set("d", b"x" * 10)
+    assert backend.get("b") is None
+    assert backend.get("a") is not None
+    assert backend.evictions == 1
+    assert backend.size_bytes == 30
+
+
+def test_disk_evicts_oldest_files_to_low_watermark(tmp_path, clock):
+    entry_size = 10 + cache.DiskBackend._HEADER.size
+    backend = cache.DiskBackend(str(tmp_path), max_bytes=10 * entry_size)
+    for i in range(10):
+        backend.set(f"dqt:ns:{i}", b"x" * 10)
+        # 按文件修改时间淘汰，显式设置以免依赖文件系统时间精度
+        os.utime(backend._path(f"dqt:ns:{i}"), (i + 1, i + 1))
+    backend.set("dqt:ns:new", b"x" * 10)
+    assert backend.get("dqt:ns:0") is None
+    assert backend.get("dqt:ns:1") is None
+    assert backend.get("dqt:ns:2") == b"x" * 10
+    assert backend.get("dqt:ns:new") == b"x" * 10
+    assert backend.evictions == 2
+    assert backend.size_bytes == 9 * entry_size <= backend.max_bytes * backend.LOW_WATERMARK
+
+
+def test_disk_eviction_scans_are_amortised(tmp_path, monkeypatch):
+    backend = cache.DiskBackend(str(tmp_path), max_bytes=100 * 18)
+    scans = []
+    original_scan = backend._scan
+    monkeypatch.setattr(backend, "_scan", lambda *args: scans.append(1) or original_scan(*args))
+    for i in range(300):
+        backend.set(f"dqt:ns:{i}", b"x" * 10)
+    assert len(scans) <= 25
+
+
+def test_disk_usage_includes_other_processes(tmp_path, clock):
+    first = cache.DiskBackend(str(tmp_path))
+    second = cache.DiskBackend(str(tmp_path))
+    first.set("dqt:ns:a", b"x" * 100)
+    second.set("dqt:ns:b", b"x" * 50, ttl=1)
+    clock.now += 2
+    assert first.get("dqt:ns:b") is None
+    assert first.usage()["size_bytes"] == second.usage()["size_bytes"] == 100 + first._HEADER.size
+    assert first.size_bytes == second.size_bytes
+
+
+def test_size_bytes_after_overwrite_and_delete(local_backend):
+    overhead = local_backend._HEADER.size if isinstance(local_backend, cache.DiskBackend) else 0
+    local_backend.set("dqt:ns:k", b"x" * 20)
+    local_backend.set("dqt:ns:k", b"x" * 5)
+    assert local_backend.size_bytes == 5 + overhead
+    local_backend.delete("dqt:ns:k")
+    assert local_backend.size_bytes == 0
+
+
+def test_clear_only_touches_namespace(local_backend):
+    local_backend.set("dqt:a:k", b"1")
+    local_backend.set("dqt:b:k", b"2")
+    local_backend.clear("dqt:a:")
+    assert local_backend.get("dqt:a:k") is None
+    assert local_backend.get("dqt:b:k") == b"2"
+
+
+def test_cache_treats_backend_errors_as_misses():
+    store = cache.Cache(BrokenBackend(), "ns")
+    assert store.get("k", "default") == "default"
+    assert store.get_or_set("k", lambda: "computed") == "computed"
+    stats = store.stats()
+    assert stats["hits"] == 0
+    assert stats["misses"] == 2
+    assert stats["errors"] == 3
+
+
+def test_cache_treats_corrupt_data_as_miss():
+    backend = cache.MemoryBackend()
+    backend.set("dqt:ns:k", b"\xff\x00")
+    store = cache.Cache(backend, "ns")
+    assert store.get("k") is None
+    assert store.stats()["errors"] == 1
+
+
+def test_get_or_set_respects_should_cache():
+    store = cache.Cache(cache.MemoryBackend(), "ns")
+    store.get_or_set("k", lambda: "解析失败", should_cache=lambda value: value != "解析失败")
+    assert store.get("k") is None
+    assert store.get_or_set("k", lambda: "ok") == "ok"
+    assert store.get("k") == "ok"
+    assert store.stats()["hit_rate"] == 0.25
+
+
+def test_non_positive_ttl_disables_namespace():
+    store = cache.Cache(cache.MemoryBackend(), "ns", ttl=0)
+    store.set("k", "v")
+    assert store.get("k") is None
+
+
+def test_namespace_size(local_backend):
+    store = cache.Cache(local_backend, "a")
+    other = cache.Cache(local_backend, "b")
+    store.set("k", "v" * 10)
+    other.set("k", "v")
+    overhead = local_backend._HEADER.size if isinstance(local_backend, cache.DiskBackend) else 0
+    assert store.stats()["size_bytes"] == store.stats()["bytes_written"] + overhead
+
+
+@pytest.fixture
+def redis_backend():
+    fakeredis = pytest.importorskip("fakeredis")
+    return cache.RedisBackend(client=fakeredis.FakeRedis())
+
+
+def test_redis_honours_px_ttl(redis_backend):
+    redis_backend.set("dqt:ns:k", b"v", ttl=1.5)
+    assert 0 < redis_backend.client.pttl("dqt:ns:k") <= 1500
+    assert redis_backend.get("dqt:ns:k") == b"v"
+    redis_backend.set("dqt:ns:forever", b"v")
+    assert redis_backend.client.pttl("dqt:ns:forever") == -1
+    redis_backend.set("dqt:ns:short", b"v", ttl=0.05)
+    time.sleep(0.1)
+    assert redis_backend.get("dqt:ns:short") is None
+
+
+def test_redis_clear_prefix(redis_backend):
+    redis_backend.set("dqt:a:1", b"1")
+    redis_backend.set("dqt:a:2", b"2")
+    redis_backend.set("dqt:b:1", b"3")
+    redis_backend.clear("dqt:a:")
+    assert redis_backend.get("dqt:a:1") is None
+    assert redis_backend.get("dqt:a:2") is None
+    assert redis_backend.get("dqt:b:1") == b"3"
+
+
+def test_redis_round_trip_through_cache(redis_backend):
+    store = cache.Cache(redis_backend, "extract_text", ttl=60)
+    store.set("k", VALUE)
+    assert store.get("k") == VALUE
+    assert store.stats()["size_bytes"] is None
+
+
+def test_redis_circuit_breaker_skips_calls_after_failure(clock):
+    calls = []
+
+    class DeadClient:
+        def get(self, key):
+            calls.append(key)
+            raise ConnectionError("timeout")
+
+    backend = cache.RedisBackend(client=DeadClient(), retry_after=30)
+    store = cache.Cache(backend, "ns")
+    for _ in range(3):
+        assert store.get("k") is None
+    assert len(calls) == 1
+    clock.now += 31
+    store.get("k")
+    assert len(calls) == 2
+
+
+def test_get_cache_initialises_backend_once(monkeypatch):
+    created = []
+
+    def create_backend(config):
+        created.append(config)
+        return cache.MemoryBackend()
+
+    monkeypatch.setattr(cache, "create_backend", create_backend)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(cache.get_cache("ns"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_cache_stats_reports_namespaces():
+    cache.configure_cache({"ttl": {"ns": 60}}, backend=cache.MemoryBackend())
+    store = cache.get_cache("ns")
+    assert store.ttl == 60
+    store.get_or_set("k", lambda: "v")
+    store.get("k")
+    stats = cache.cache_stats()
+    assert stats["backend"] == "MemoryBackend"
+    assert stats["namespaces"]["ns"]["hits"] == 1
+    assert stats["usage"]["entries"] == 1
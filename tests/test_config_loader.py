@@ -0,0 +1,108 @@
+import json
+import logging
+
+import pytest
+
+from utils import cache, config_loader
+from utils.config_loader import load_config
+
+ENV_VARS = [
+    "COS_SECRET_ID", "COS_SECRET_KEY", "COS_REGION", "COS_BUCKET",
+    "COZE_API_KEY", "COZE_BOT_ID", "COZE_TRAIN_WORKFLOW_ID", "COZE_CONTRACT_WORKFLOW_ID",
+    "FASTGPT_API", "FASTGPT_KEY", "FASTGPT_APPID",
+    "CACHE_BACKEND", "CACHE_REDIS_URL", "CACHE_DIR", "CACHE_PREFIX", "CACHE_DEFAULT_TTL", "CACHE_TTL"
+]
+
+REQUIRED_ENV = {
+    "COS_SECRET_ID": "id",
+    "COS_SECRET_KEY": "key",
+    "COS_BUCKET": "bucket",
+    "COZE_API_KEY": "coze",
+    "COZE_CONTRACT_WORKFLOW_ID": "workflow",
+    "FASTGPT_API": "https://fastgpt.example/api",
+    "FASTGPT_KEY": "fastgpt",
+    "FASTGPT_APPID": "app"
+}
+
+FILE_CACHE = {
+    "backend": "memory",
+    "redis_url": "redis://file:6379/0",
+    "memory_max_bytes": 1024,
+    "ttl": {"extract_text": 600, "coze_workflow": 60}
+}
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in ENV_VARS:
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(cache, "_backend", None)
+    monkeypatch.setattr(cache, "_cache_config", None)
+    monkeypatch.setattr(cache, "_caches", {})
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps({"cos": {}, "coze": {}, "fastgpt": {}, "cache": FILE_CACHE}), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def production_env(monkeypatch):
+    for name, value in REQUIRED_ENV.items():
+        monkeypatch.setenv(name, value)
+
+
+def test_file_branch_merges_cache_env(monkeypatch, config_path):
+    monkeypatch.setenv("CACHE_BACKEND", "redis")
+    cache_config = load_config(config_path)["cache"]
+    assert cache_config["backend"] == "redis"
+    # 未设置的 CACHE_* 变量不应以 None 覆盖文件中的值
+    assert cache_config["redis_url"] == "redis://file:6379/0"
+    assert "disk_dir" not in cache_config
+    assert cache_config["ttl"] == FILE_CACHE["ttl"]
+
+
+def test_env_branch_reads_file_cache_section(production_env, config_path):
+    cache_config = load_config(config_path)["cache"]
+    assert cache_config["memory_max_bytes"] == 1024
+    assert cache_config["ttl"] == FILE_CACHE["ttl"]
+
+
+def test_env_branch_without_config_file(production_env, tmp_path):
+    config = load_config(str(tmp_path / "missing.json"))
+    assert config["cache"] == {}
+
+
+def test_cache_ttl_env_merges_per_namespace(monkeypatch, production_env, config_path):
+    monkeypatch.setenv("CACHE_BACKEND", "redis")
+    monkeypatch.setenv("CACHE_TTL", '{"coze_workflow": 0, "fastgpt_chat": 120}')
+    cache_config = load_config(config_path)["cache"]
+    assert cache_config["backend"] == "redis"
+    assert cache_config["ttl"] == {"extract_text": 600, "coze_workflow": 0, "fastgpt_chat": 120}
+
+
+@pytest.mark.parametrize("value", ["not json", "[1, 2]"])
+def test_invalid_cache_ttl_is_ignored(monkeypatch, production_env, config_path, caplog, value):
+    monkeypatch.setenv("CACHE_TTL", value)
+    with caplog.at_level(logging.WARNING, logger="utils.config_loader"):
+        cache_config = load_config(config_path)["cache"]
+    assert cache_config["ttl"] == FILE_CACHE["ttl"]
+    assert "CACHE_TTL" in caplog.text
+
+
+def test_get_cache_converts_env_default_ttl(monkeypatch, production_env, config_path):
+    monkeypatch.setenv("CACHE_DEFAULT_TTL", "120")
+    monkeypatch.setattr(config_loader, "load_config", lambda: load_config(config_path))
+    assert cache.get_cache("fastgpt_chat").ttl == 120.0
+    assert cache.get_cache("extract_text").ttl == 600.0
+
+
+def test_get_cache_logs_config_errors(monkeypatch, caplog):
+    # 只设置部分生产环境变量，load_config 会因缺少关键配置抛出 ValueError
+    monkeypatch.setenv("COS_SECRET_ID", "id")
+    with caplog.at_level(logging.WARNING, logger="utils.cache"):
+        store = cache.get_cache("extract_text")
+    assert isinstance(store.backend, cache.MemoryBackend)
+    assert "环境变量缺失关键配置" in caplog.text
@@ -0,0 +1,605 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Dict, Any, Callable, Optional
+
+# 可选依赖：缺失时回退到 json / zlib，保证单机开发环境也能运行
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# 序列化格式：首字节高4位为编码方式，低4位为压缩方式
+_CODEC_JSON = 0x00
+_CODEC_MSGPACK = 0x10
+_COMPRESS_NONE = 0x00
+_COMPRESS_ZLIB = 0x01
+_COMPRESS_ZSTD = 0x02
+
+DEFAULT_CACHE_CONFIG = {
+    "backend": "memory",
+    "prefix": "dqt",
+    "default_ttl": 3600,
+    "ttl": {},
+    "compress_threshold": 1024,
+    "memory_max_bytes": 64 * 1024 * 1024,
+    "disk_dir": ".cache",
+    "disk_max_bytes": 512 * 1024 * 1024,
+    "redis_url": "redis://localhost:6379/0",
+    "redis_connect_timeout": 0.5,
+    "redis_socket_timeout": 1.0,
+    "redis_retry_after": 30
+}
+
+
+def dumps(value: Any, compress_threshold: int = 1024) -> bytes:
+    """
+    将值序列化为紧凑的字节串（优先 msgpack + zstd）
+
+    Args:
+        value: 需缓存的值，须为 str/int/float/bool/None/list/dict 等基础类型
+        compress_threshold: 超过该字节数才压缩
+
+    Returns:
+        带格式头的字节串
+    """
+    if msgpack is not None:
+        codec = _CODEC_MSGPACK
+        body = msgpack.packb(value, use_bin_type=True)
+    else:
+        codec = _CODEC_JSON
+        body = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    compression = _COMPRESS_NONE
+    if len(body) > compress_threshold:
+        if zstandard is not None:
+            compression = _COMPRESS_ZSTD
+            body = zstandard.ZstdCompressor(level=3).compress(body)
+        else:
+            compression = _COMPRESS_ZLIB
+            body = zlib.compress(body, 6)
+    return bytes([codec | compression]) + body
+
+
+def loads(data: bytes) -> Any:
+    """
+    反序列化 dumps 生成的字节串
+
+    Raises:
+        ValueError: 格式头无法识别，或本机缺少对应的解码依赖
+    """
+    header, body = data[0], data[1:]
+    codec, compression = header & 0xF0, header & 0x0F
+
+    if compression == _COMPRESS_ZSTD:
+        if zstandard is None:
+            raise ValueError("缓存数据使用zstd压缩，但未安装zstandard")
+        body = zstandard.ZstdDecompressor().decompress(body)
+    elif compression == _COMPRESS_ZLIB:
+        body = zlib.decompress(body)
+    elif compression != _COMPRESS_NONE:
+        raise ValueError(f"未知的缓存压缩格式: {compression}")
+
+    if codec == _CODEC_MSGPACK:
+        if msgpack is None:
+            raise ValueError("缓存数据使用msgpack编码，但未安装msgpack")
+        return msgpack.unpackb(body, raw=False)
+    if codec == _CODEC_JSON:
+        return json.loads(body.decode("utf-8"))
+    raise ValueError(f"未知的缓存编码格式: {codec}")
+
+
+def make_key(*parts: Any) -> str:
+    """根据任意参数（含文件字节）生成稳定的缓存键"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = json.dumps(part, ensure_ascii=False, sort_keys=True).encode("utf-8")
+        # 写入长度前缀，避免 ("ab", "c") 与 ("a", "bc") 冲突
+        digest.update(struct.pack(">Q", len(part)))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+class MemoryBackend:
+    """进程内 LRU 缓存，按字节数限制容量"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.evictions = 0
+        self._entries = OrderedDict()  # key -> (过期时间戳或None, data)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, data = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return data
+
+    def set(self, key: str, data: bytes, ttl: Optional[float] = None):
+        if len(data) > self.max_bytes:
+            return
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (expires_at, data)
+            self.size_bytes += len(data)
+            while self.size_bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+    def clear(self, prefix: str = ""):
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._remove(key)
+
+    def size_of(self, prefix: str) -> int:
+        """统计指定前缀（命名空间）当前占用的字节数"""
+        with self._lock:
+            return sum(len(data) for key, (_, data) in self._entries.items() if key.startswith(prefix))
+
+    def usage(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size_bytes": self.size_bytes,
+                "max_bytes": self.max_bytes,
+                "entries": len(self._entries),
+                "evictions": self.evictions
+            }
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= len(entry[1])
+
+
+class DiskBackend:
+    """
+    本地磁盘缓存，同一主机上的多个进程可共享，每个命名空间一个子目录
+
+    size_bytes 只是本进程的估算值：其他进程的写入不会实时计入，
+    超过容量上限或距上次扫描超过 RESCAN_INTERVAL 秒时才扫描目录校正；
+    需要准确数据请使用 usage()
+    """
+
+    _HEADER = struct.Struct(">d")  # 过期时间戳，0表示永不过期
+    LOW_WATERMARK = 0.9  # 淘汰到容量上限的该比例，避免每次写入都扫描目录
+    RESCAN_INTERVAL = 60
+
+    def __init__(self, directory: str = ".cache", max_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.size_bytes = sum(size for _, size, _ in self._scan())
+        self._scanned_at = time.time()
+
+    def _namespace_dir(self, prefix: str) -> str:
+        """将 "dqt:extract_text:" 形式的前缀映射为子目录"""
+        return os.path.join(self.directory, re.sub(r"[^\w.-]", "_", prefix.rstrip(":")))
+
+    def _path(self, key: str) -> str:
+        prefix = key.rpartition(":")[0]
+        return os.path.join(self._namespace_dir(prefix), hashlib.sha256(key.encode("utf-8")).hexdigest())
+
+    def _scan(self, directory: Optional[str] = None):
+        """返回 (路径, 大小, 修改时间) 列表；未指定目录时扫描全部命名空间"""
+        if directory is None:
+            directories = [self.directory]
+            directories += [entry.path for entry in os.scandir(self.directory) if entry.is_dir()]
+        else:
+            directories = [directory]
+        result = []
+        for path in directories:
+            try:
+                entries = list(os.scandir(path))
+            except FileNotFoundError:
+                continue
+            for entry in entries:
+                if entry.is_file() and not entry.name.endswith(".tmp"):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    result.append((entry.path, stat.st_size, stat.st_mtime))
+        return result
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            return None
+        (expires_at,) = self._HEADER.unpack_from(raw)
+        if expires_at and expires_at <= time.time():
+            with self._lock:
+                self._unlink(path)
+            return None
+        return raw[self._HEADER.size:]
+
+    def set(self, key: str, data: bytes, ttl: Optional[float] = None):
+        path = self._path(key)
+        raw = self._HEADER.pack(time.time() + ttl if ttl else 0) + data
+        if len(raw) > self.max_bytes:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 先写临时文件再原子替换，避免其他进程读到半截数据
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(raw)
+        with self._lock:
+            self._unlink(path)
+            os.replace(tmp_path, path)
+            self.size_bytes += len(raw)
+            if (self.size_bytes > self.max_bytes
+                    or time.time() - self._scanned_at > self.RESCAN_INTERVAL):
+                self._evict()
+
+    def delete(self, key: str):
+        with self._lock:
+            self._unlink(self._path(key))
+
+    def clear(self, prefix: str = ""):
+        """清空指定命名空间；prefix 须为完整的命名空间前缀，为空时清空全部"""
+        directory = self._namespace_dir(prefix) if prefix else None
+        with self._lock:
+            for path, _, _ in self._scan(directory):
+                self._unlink(path)
+
+    def size_of(self, prefix: str) -> int:
+        """统计指定命名空间当前占用的字节数"""
+        return sum(size for _, size, _ in self._scan(self._namespace_dir(prefix)))
+
+    def usage(self) -> Dict[str, Any]:
+        """扫描目录得到包含其他进程写入在内的实际占用，evictions 仅为本进程的淘汰次数"""
+        size_bytes = sum(size for _, size, _ in self._scan())
+        with self._lock:
+            self.size_bytes = size_bytes
+            self._scanned_at = time.time()
+        return {
+            "size_bytes": size_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions
+        }
+
+    def _unlink(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            self.size_bytes = max(self.size_bytes - size, 0)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """扫描目录校正占用；超过容量上限时按修改时间淘汰最旧的文件，直到低于低水位"""
+        entries = sorted(self._scan(), key=lambda item: item[2])
+        self.size_bytes = sum(size for _, size, _ in entries)
+        self._scanned_at = time.time()
+        if self.size_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * self.LOW_WATERMARK
+        for path, _, _ in entries:
+            if self.size_bytes <= target:
+                break
+            self._unlink(path)
+            self.evictions += 1
+
+
+class RedisBackend:
+    """Redis 协议缓存，供负载均衡后的多个副本共享"""
+
+    def __init__(self, url: str = "redis://localhost:6379/0", client: Any = None,
+                 connect_timeout: float = 0.5, socket_timeout: float = 1.0,
+                 retry_after: float = 30):
+        """
+        Args:
+            url: Redis 连接地址
+            client: 可选，直接传入兼容 redis-py 接口的客户端（如测试用的 fakeredis）
+            connect_timeout: 建立连接的超时秒数
+            socket_timeout: 单次读写的超时秒数
+            retry_after: 出错后暂停访问 Redis 的秒数，期间所有操作直接失败
+        """
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(
+                url,
+                socket_connect_timeout=connect_timeout,
+                socket_timeout=socket_timeout
+            )
+        self.client = client
+        self.retry_after = retry_after
+        self._down_until = 0.0
+
+    def _call(self, method: str, *args, **kwargs) -> Any:
+        """调用客户端方法；Redis 不可用时熔断，避免每次查询都等待超时"""
+        if self._down_until > time.time():
+            raise ConnectionError("Redis 暂不可用，缓存已熔断")
+        try:
+            return getattr(self.client, method)(*args, **kwargs)
+        except Exception:
+            self._down_until = time.time() + self.retry_after
+            raise
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._call("get", key)
+
+    def set(self, key: str, data: bytes, ttl: Optional[float] = None):
+        if ttl:
+            self._call("set", key, data, px=int(ttl * 1000))
+        else:
+            self._call("set", key, data)
+
+    def delete(self, key: str):
+        self._call("delete", key)
+
+    def clear(self, prefix: str = ""):
+        keys = list(self._call("scan_iter", match=f"{prefix}*"))
+        if keys:
+            self._call("delete", *keys)
+
+    def usage(self) -> Dict[str, Any]:
+        """
+        读取 Redis 服务端的内存占用与淘汰次数
+
+        注意这是整个 Redis 实例的数据（可能包含其他应用），不区分命名空间；
+        Redis 不可用或不支持 INFO 命令时返回错误信息，且不触发熔断
+        """
+        if self._down_until > time.time():
+            return {"error": "Redis 暂不可用"}
+        try:
+            memory = self.client.info("memory")
+            stats = self.client.info("stats")
+        except Exception as e:
+            return {"error": str(e)}
+        return {
+            "size_bytes": memory.get("used_memory"),
+            "max_bytes": memory.get("maxmemory"),
+            "evictions": stats.get("evicted_keys")
+        }
+
+
+class Cache:
+    """命名空间缓存：负责键前缀、TTL、序列化及命中统计"""
+
+    def __init__(self, backend: Any, namespace: str, ttl: Optional[float] = None,
+                 prefix: str = "dqt", compress_threshold: int = 1024):
+        self.backend = backend
+        self.namespace = namespace
+        self.ttl = ttl
+        self.compress_threshold = compress_threshold
+        self._key_prefix = f"{prefix}:{namespace}:"
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "errors": 0,
+            "bytes_read": 0,
+            "bytes_written": 0
+        }
+
+    @property
+    def enabled(self) -> bool:
+        """TTL 配置为 0 或负数时视为关闭该命名空间的缓存"""
+        return self.ttl is None or self.ttl > 0
+
+    def _count(self, **deltas: int):
+        with self._lock:
+            for name, delta in deltas.items():
+                self._stats[name] += delta
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """读取缓存，后端异常或数据损坏均按未命中处理"""
+        if not self.enabled:
+            return default
+        try:
+            data = self.backend.get(self._key_prefix + key)
+            if data is None:
+                self._count(misses=1)
+                return default
+            value = loads(data)
+        except Exception:
+            self._count(misses=1, errors=1)
+            return default
+        self._count(hits=1, bytes_read=len(data))
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        """写入缓存，后端不可用时静默失败，不影响业务流程"""
+        if not self.enabled:
+            return
+        try:
+            data = dumps(value, self.compress_threshold)
+            self.backend.set(self._key_prefix + key, data, ttl if ttl is not None else self.ttl)
+        except Exception:
+            self._count(errors=1)
+            return
+        self._count(sets=1, bytes_written=len(data))
+
+    def delete(self, key: str):
+        try:
+            self.backend.delete(self._key_prefix + key)
+        except Exception:
+            self._count(errors=1)
+
+    def clear(self):
+        """清空当前命名空间"""
+        try:
+            self.backend.clear(self._key_prefix)
+        except Exception:
+            self._count(errors=1)
+
+    def get_or_set(self, key: str, func: Callable[[], Any],
+                   should_cache: Optional[Callable[[Any], bool]] = None) -> Any:
+        """
+        命中则直接返回，否则调用 func 计算并写入缓存
+
+        Args:
+            key: 缓存键，通常由 make_key 生成
+            func: 未命中时的计算函数
+            should_cache: 可选，判断结果是否值得缓存（如排除错误信息）
+
+        Returns:
+            缓存值或 func 的返回值
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            return value
+        value = func()
+        if should_cache is None or should_cache(value):
+            self.set(key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        返回本进程内的命中率及读写字节数等统计信息
+
+        size_bytes 为该命名空间当前占用的字节数，仅 memory/disk 后端提供；
+        redis 后端为 None，其容量见 cache_stats() 中的服务端数据
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"]
+        stats["namespace"] = self.namespace
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["size_bytes"] = None
+        if hasattr(self.backend, "size_of"):
+            try:
+                stats["size_bytes"] = self.backend.size_of(self._key_prefix)
+            except Exception:
+                pass
+        return stats
+
+
+_backend = None
+_cache_config = None
+_caches: Dict[str, Cache] = {}
+_registry_lock = threading.RLock()
+_warned = set()
+
+
+def _warn_once(message: str):
+    if message not in _warned:
+        _warned.add(message)
+        logger.warning(message)
+
+
+def create_backend(cache_config: Dict[str, Any]) -> Any:
+    """
+    根据配置创建缓存后端
+
+    Raises:
+        ValueError: 当 backend 取值不受支持时抛出
+    """
+    backend = cache_config["backend"]
+    if backend == "memory":
+        return MemoryBackend(int(cache_config["memory_max_bytes"]))
+    if backend == "disk":
+        return DiskBackend(cache_config["disk_dir"], int(cache_config["disk_max_bytes"]))
+    if backend == "redis":
+        return RedisBackend(
+            cache_config["redis_url"],
+            connect_timeout=float(cache_config["redis_connect_timeout"]),
+            socket_timeout=float(cache_config["redis_socket_timeout"]),
+            retry_after=float(cache_config["redis_retry_after"])
+        )
+    raise ValueError(f"不支持的缓存后端: {backend}（可选 memory/disk/redis）")
+
+
+def configure_cache(cache_config: Optional[Dict[str, Any]] = None, backend: Any = None):
+    """
+    （重新）初始化全局缓存，已创建的命名空间会被丢弃
+
+    Args:
+        cache_config: 缓存配置，未提供的项使用 DEFAULT_CACHE_CONFIG
+        backend: 可选，直接指定后端实例
+    """
+    global _backend, _cache_config
+    config = {**DEFAULT_CACHE_CONFIG, **(cache_config or {})}
+    with _registry_lock:
+        _cache_config = config
+        _backend = backend if backend is not None else create_backend(config)
+        _caches.clear()
+
+        if isinstance(_backend, MemoryBackend):
+            _warn_once("缓存后端为 memory，仅在当前进程内生效；多副本部署请设置 CACHE_BACKEND=redis")
+        elif msgpack is None or zstandard is None:
+            # 不同格式的副本互相读不懂对方写入的数据，共享缓存命中率会降为0
+            _warn_once("未安装 msgpack/zstandard，共享缓存将以 json/zlib 格式写入，"
+                       "已安装依赖的副本无法读取，请确保所有副本依赖一致")
+
+
+def get_cache(namespace: str) -> Cache:
+    """获取指定命名空间的缓存，首次调用时从 load_config() 的 cache 节读取配置"""
+    # 检查与初始化须在同一把锁内完成，否则并发首次调用会重复创建后端
+    with _registry_lock:
+        if _backend is None:
+            from utils.config_loader import load_config
+            try:
+                cache_config = load_config().get("cache", {})
+            except (FileNotFoundError, ValueError) as e:
+                # 配置缺失或有误时退回默认配置，须记录原因，否则 redis 部署会悄然降级为进程内缓存
+                logger.warning(f"读取缓存配置失败，使用默认配置: {e}")
+                cache_config = {}
+            configure_cache(cache_config)
+
+        cache = _caches.get(namespace)
+        if cache is None:
+            ttl = _cache_config["ttl"].get(namespace, _cache_config["default_ttl"])
+            cache = Cache(
+                _backend,
+                namespace,
+                ttl=float(ttl) if ttl is not None else None,
+                prefix=_cache_config["prefix"],
+                compress_threshold=int(_cache_config["compress_threshold"])
+            )
+            _caches[namespace] = cache
+        return cache
+
+
+def cache_stats() -> Dict[str, Any]:
+    """
+    汇总各命名空间的统计信息，以及后端的容量占用
+
+    Returns:
+        {"backend": 后端类型, "usage": 后端容量信息, "namespaces": {命名空间: 统计}}
+    """
+    with _registry_lock:
+        backend = _backend
+        caches = list(_caches.values())
+    if backend is None:
+        return {"backend": None, "usage": {}, "namespaces": {}}
+    return {
+        "backend": type(backend).__name__,
+        "usage": backend.usage() if hasattr(backend, "usage") else {},
+        "namespaces": {cache.namespace: cache.stats() for cache in caches}
+    }
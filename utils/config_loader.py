@@ -1,6 +1,9 @@
 import json
+import logging
 import os
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
 
 
 def load_config(config_path: str = None) -> Dict[str, Any]:
@@ -36,9 +39,22 @@ def load_config(config_path: str = None) -> Dict[str, Any]:
             "api": os.getenv("FASTGPT_API"),
             "key": os.getenv("FASTGPT_KEY"),
             "appid": os.getenv("FASTGPT_APPID")
-        }
+        },
+        # 缓存为可选配置，仅保留已设置的环境变量，未设置项沿用文件或默认值
+        "cache": {key: value for key, value in {
+            "backend": os.getenv("CACHE_BACKEND"),
+            "redis_url": os.getenv("CACHE_REDIS_URL"),
+            "disk_dir": os.getenv("CACHE_DIR"),
+            "prefix": os.getenv("CACHE_PREFIX"),
+            "default_ttl": os.getenv("CACHE_DEFAULT_TTL"),
+            "ttl": _parse_cache_ttl(os.getenv("CACHE_TTL"))
+        }.items() if value is not None}
     }
 
+    if config_path is None:
+        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        config_path = os.path.join(base_dir, "config.json")
+
     # 检查关键环境变量是否已配置
     env_configured = any([
         env_config["cos"]["secret_id"],
@@ -60,13 +76,15 @@ def load_config(config_path: str = None) -> Dict[str, Any]:
                     raise ValueError(
                         f"环境变量缺失关键配置: {section.upper()}_{key.upper()}"
                     )
+
+        # 缓存细项（各命名空间TTL、容量等）在生产环境仍可沿用config.json
+        if os.path.exists(config_path):
+            with open(config_path, "r", encoding="utf-8") as f:
+                file_cache = json.load(f).get("cache", {})
+            env_config["cache"] = _merge_cache_config(file_cache, env_config["cache"])
         return env_config
 
     # 2. 回退到本地config.json（开发环境）
-    if config_path is None:
-        base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        config_path = os.path.join(base_dir, "config.json")
-
     if not os.path.exists(config_path):
         raise FileNotFoundError(
             "未找到任何有效配置！\n"
@@ -83,5 +101,31 @@ def load_config(config_path: str = None) -> Dict[str, Any]:
     return {
         "cos": {**file_config.get("cos", {}), **env_config["cos"]},
         "coze": {**file_config.get("coze", {}), **env_config["coze"]},
-        "fastgpt": {**file_config.get("fastgpt", {}), **env_config["fastgpt"]}
-    }
\ No newline at end of file
+        "fastgpt": {**file_config.get("fastgpt", {}), **env_config["fastgpt"]},
+        "cache": _merge_cache_config(file_config.get("cache", {}), env_config["cache"])
+    }
+
+
+def _parse_cache_ttl(value: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    解析 CACHE_TTL 环境变量，格式为JSON对象，如 {"coze_workflow": 0}
+
+    缓存为可选功能，格式错误时仅记录警告并忽略，不影响页面加载
+    """
+    if not value:
+        return None
+    try:
+        ttl = json.loads(value)
+    except json.JSONDecodeError:
+        ttl = None
+    if not isinstance(ttl, dict):
+        logger.warning(f"环境变量 CACHE_TTL 须为JSON对象，已忽略，当前值: {value}")
+        return None
+    return ttl
+
+
+def _merge_cache_config(file_cache: Dict[str, Any], env_cache: Dict[str, Any]) -> Dict[str, Any]:
+    """合并缓存配置（环境变量优先），ttl 按命名空间逐项合并"""
+    merged = {**file_cache, **env_cache}
+    merged["ttl"] = {**file_cache.get("ttl", {}), **env_cache.get("ttl", {})}
+    return merged
\ No newline at end of file